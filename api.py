@@ -1,6 +1,7 @@
 # api.py
 import base64
 import io
+import logging
 import re
 from typing import List, Dict, Optional
 
@@ -11,11 +12,20 @@ from PyPDF2 import PdfReader, PdfWriter
 from parsers import bbva_parser
 
 app = Flask(__name__)
+# Las respuestas pueden tener miles de movimientos: se serializan en el orden
+# en que se construyen en lugar de ordenar las llaves de cada diccionario
+app.json.sort_keys = False
+
+logger = logging.getLogger(__name__)
 
 BANK_PARSERS = {
     "BBVA": bbva_parser,
 }
 
+_BBVA_YEAR_RE = re.compile(r'DEL \d{2}/\d{2}/(\d{4})')
+# El periodo ("DEL dd/mm/aaaa") vive en el encabezado de la página
+_YEAR_SCAN_LIMIT = 2000
+
 def identify_bank_and_year(pdf: pdfplumber.PDF) -> (Optional[str], Optional[str]):
     """
     Identifica el banco y el año buscando en las primeras dos páginas del PDF.
@@ -24,18 +34,15 @@ def identify_bank_and_year(pdf: pdfplumber.PDF) -> (Optional[str], Optional[str]
     
     # Itera sobre las dos primeras páginas para encontrar la información
     for page in pdf.pages[:2]:
-        text = page.extract_text().upper()
+        text = (page.extract_text() or "").upper()
         
         # Identificar banco
-        if not bank:
-            if "BBVA" in text:
-                bank = "BBVA"
-            else:
-                bank = "Banco no soportado"
+        if not bank and "BBVA" in text:
+            bank = "BBVA"
         
         # Extraer año
         if not year:
-            match_bbva = re.search(r'DEL \d{2}/\d{2}/(\d{4})', text)
+            match_bbva = _BBVA_YEAR_RE.search(text, 0, _YEAR_SCAN_LIMIT) or _BBVA_YEAR_RE.search(text)
             
             if match_bbva:
                 year = match_bbva.group(1)
@@ -44,6 +51,10 @@ def identify_bank_and_year(pdf: pdfplumber.PDF) -> (Optional[str], Optional[str]
         if bank and year:
             break
             
+    # El banco solo se marca como no soportado después de revisar ambas páginas
+    if not bank:
+        bank = "Banco no soportado"
+
     # Si después del bucle no se encontró el año, se asigna el actual
     if not year:
         from datetime import datetime
@@ -51,23 +62,23 @@ def identify_bank_and_year(pdf: pdfplumber.PDF) -> (Optional[str], Optional[str]
         
     return bank, year
 
-@app.route('/extraer_datos_pdf', methods=['POST'])
-def extract_endpoint():
+def open_pdf(pdf_stream: io.BytesIO) -> pdfplumber.PDF:
     """
-    Endpoint multibancario para extraer transacciones de un PDF en Base64.
+    Abre el PDF con pdfplumber y solo si no se puede leer lo reconstruye con PyPDF2.
     """
-    if not request.json or 'pdf_base64' not in request.json:
-        return jsonify({"error": "Petición inválida. Se requiere JSON con 'pdf_base64'."}), 400
-
-    base64_string = request.json['pdf_base64']
-    
     try:
-        pdf_bytes = base64.b64decode(base64_string)
-        pdf_stream = io.BytesIO(pdf_bytes)
-    except Exception as e:
-        return jsonify({"error": f"Error de decodificación Base64: {e}"}), 400
+        pdf = pdfplumber.open(pdf_stream)
+        # Fuerza la lectura del árbol de páginas, que es donde fallan los PDF dañados;
+        # con el xref ilegible pdfplumber no falla pero no encuentra ninguna página
+        if pdf.pages:
+            return pdf
+    except Exception:
+        # No se llama a close(): recorre pdf.pages y volvería a lanzar el mismo error.
+        # El stream es externo, así que basta con descartar el objeto.
+        pass
 
     # Capa de reparación de PDF
+    pdf_stream.seek(0)
     repaired_stream = io.BytesIO()
     try:
         reader = PdfReader(pdf_stream)
@@ -80,24 +91,41 @@ def extract_endpoint():
         pdf_stream.seek(0)
         repaired_stream = pdf_stream
 
+    return pdfplumber.open(repaired_stream)
+
+@app.route('/extraer_datos_pdf', methods=['POST'])
+def extract_endpoint():
+    """
+    Endpoint multibancario para extraer transacciones de un PDF en Base64.
+    """
+    if not request.json or 'pdf_base64' not in request.json:
+        return jsonify({"error": "Petición inválida. Se requiere JSON con 'pdf_base64'."}), 400
+
+    base64_string = request.json['pdf_base64']
+    
+    try:
+        pdf_bytes = base64.b64decode(base64_string)
+        pdf_stream = io.BytesIO(pdf_bytes)
+    except Exception as e:
+        return jsonify({"error": f"Error de decodificación Base64: {e}"}), 400
+
     try:
-        with pdfplumber.open(repaired_stream) as pdf:
+        with open_pdf(pdf_stream) as pdf:
             bank, year = identify_bank_and_year(pdf)
             
             if not bank or bank not in BANK_PARSERS:
                 return jsonify({"error": "No se pudo identificar el banco del PDF o no hay un parser disponible."}), 400
             
-            print(f"Banco identificado: {bank}, Año: {year}. Usando el parser correspondiente...")
+            logger.debug("Banco identificado: %s, Año: %s. Usando el parser correspondiente...", bank, year)
             
             parser_module = BANK_PARSERS[bank]
             transactions = parser_module.parse(pdf, year)
             
-            print(f"Extracción exitosa. Se encontraron {len(transactions)} transacciones.")
+            logger.debug("Extracción exitosa. Se encontraron %d transacciones.", len(transactions["movimientos"]))
             return jsonify(transactions), 200
             
     except Exception as e:
-        import traceback
-        print(f"ERROR: Ocurrió un error interno durante el procesamiento del PDF: {traceback.format_exc()}")
+        logger.exception("Ocurrió un error interno durante el procesamiento del PDF")
         return jsonify({"error": "Error interno del servidor al procesar el archivo PDF.", "details": str(e)}), 500
 
 if __name__ == '__main__':
@@ -1,8 +1,13 @@
 # parsers/bbva_parser.py
+import logging
 import pdfplumber
 import re
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+from datetime import date, datetime
+
+logger = logging.getLogger(__name__)
 
 IGNORE_PATTERNS = [
     # Encabezados generales
@@ -53,61 +58,129 @@ IGNORE_PATTERNS = [
     r"No\. Cliente \d+"
 ]
 
+_IGNORE_RE = re.compile("|".join(f"(?:{pat})" for pat in IGNORE_PATTERNS), re.IGNORECASE)
+
 MONTH_MAP = {
     'ENE': '01', 'FEB': '02', 'MAR': '03', 'ABR': '04', 'MAY': '05', 'JUN': '06',
     'JUL': '07', 'AGO': '08', 'SEP': '09', 'OCT': '10', 'NOV': '11', 'DIC': '12'
 }
 
+_MONTH_RE = re.compile("|".join(MONTH_MAP))
+_AMOUNT_DROP_TBL = str.maketrans('', '', '$,')
+_X0 = itemgetter('x0')
+
+# Expresiones regulares precompiladas (metadatos y líneas de movimientos)
+_TOTALS_TC_RE = re.compile(r'TOTAL IMPORTES:\s+\$\s*([\d,]+\.\d{2})\s+-\$\s*([\d,]+\.\d{2})', re.IGNORECASE)
+_TOTALS_DEB_RE = re.compile(
+    r'TOTAL IMPORTE CARGOS\s+(?P<imp_c>[\d,]+\.\d{2})\s+TOTAL MOVIMIENTOS CARGOS\s+(?P<mov_c>\d+)'
+    r'|TOTAL IMPORTE ABONOS\s+(?P<imp_a>[\d,]+\.\d{2})\s+TOTAL MOVIMIENTOS ABONOS\s+(?P<mov_a>\d+)',
+    re.IGNORECASE)
+_CLABE_RE = re.compile(r'(?:No\.?\s+(?:de\s+)?)?Cuenta\s+CLABE\s+([\d\s]+)', re.IGNORECASE)
+_NON_DIGIT_RE = re.compile(r'\D')
+_ACCT_TC_RE = re.compile(r'No\.\s+de\s+Tarjeta\s+([\d\s]+)', re.IGNORECASE)
+_ACCT_DEB_RE = re.compile(r'No\.?\s+(?:de\s+)?Cuenta\s+(\d+)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+_NAME_RCPT_RE = re.compile(r'Nombre\s+del\s+Receptor\s*:\s*(.+)', re.IGNORECASE)
+_NAME_BBVA_RE = re.compile(r'BBVA\s*\n\s*([A-ZÁÉÍÓÚÑ\s]{10,}\b(?:SA\s+DE\s+CV|S\s+DE\s+RL\s+DE\s+CV|SA\s+PI\s+DE\s+CV)?)')
+_RFC_LINE_RE = re.compile(r'^[^\S\n]*R\.F\.C[^\S\n]+[A-Z0-9]+', re.IGNORECASE | re.MULTILINE)
+_NAME_SKIP_RE = re.compile(r'^(No\.|Fecha|Periodo)', re.IGNORECASE)
+# En TC "Del" puede quedar en otra línea que "Periodo", pero siempre cerca: el hueco se acota
+_PERIOD_CREDIT_RE = re.compile(r'Periodo\s[\s\S]{0,300}?Del\s+([\d\/]{8,10})\s+al\s+([\d\/]{8,10})', re.IGNORECASE)
+_PERIOD_DEBITO_RE = re.compile(r'Periodo\s+(?:DEL\s+)?([\d]{2}\/(?:\w{3}|\d{2})\/\d{2,4})\s+AL\s+([\d]{2}\/(?:\w{3}|\d{2})\/\d{2,4})', re.IGNORECASE)
+_BALANCES_TC_RE = re.compile(
+    r'Saldo Inicial del Periodo\s*\+?\s*\$?\s*(?P<ini>[\d,]+\.\d{2})'
+    r'|Saldo al Corte\s*\$?\s*(?P<fin>[\d,]+\.\d{2})',
+    re.IGNORECASE)
+_BALANCES_DEB_RE = re.compile(
+    r'(?:Saldo\s+(?:de\s+)?Liquidación\s+Inicial|Saldo\s+Inicial)\s*\+?\s*\$?(?P<ini>[\d,]+\.\d{2})'
+    r'|(?:Saldo\s+(?:de\s+Operación\s+)?Final)\s*(?:\(\+\))?\s*\$?(?P<fin>[\d,]+\.\d{2})',
+    re.IGNORECASE)
+_RFC_RE = re.compile(r'R\.?F\.?C\.?\s*[:]?\s*([A-Z0-9]{12,13})', re.IGNORECASE)
+_DATE_CREDIT_RE = re.compile(r'(\d{2}/\d{2}/\d{2})\s+(\d{2}/\d{2}/\d{2})\s+(.*)')
+_AMOUNT_CREDIT_RE = re.compile(r'(\$ ?-?\d{1,3}(?:,\d{3})*(?:\.\d{2})?)$')
+
+def _first_groups(regex: re.Pattern, text: str) -> Dict[str, str]:
+    """Recorre el texto una sola vez y guarda la primera aparición de cada grupo con nombre."""
+    found = {}
+    for match in regex.finditer(text):
+        for name, value in match.groupdict().items():
+            if value is not None:
+                found.setdefault(name, value)
+        if len(found) == len(regex.groupindex):
+            break
+    return found
+
 def _parse_totals(text: str, is_credit: bool) -> Tuple[float, int, float, int]:
     imp_c, mov_c, imp_a, mov_a = 0.0, 0, 0.0, 0
     if is_credit:
-        match = re.search(r'TOTAL IMPORTES:\s+\$\s*([\d,]+\.\d{2})\s+-\$\s*([\d,]+\.\d{2})', text, re.IGNORECASE)
+        match = _TOTALS_TC_RE.search(text)
         if match:
             imp_c = _clean_amount(match.group(1))
             imp_a = _clean_amount(match.group(2))
     else:
-        match_c = re.search(r'TOTAL IMPORTE CARGOS\s+([\d,]+\.\d{2})\s+TOTAL MOVIMIENTOS CARGOS\s+(\d+)', text, re.IGNORECASE)
-        match_a = re.search(r'TOTAL IMPORTE ABONOS\s+([\d,]+\.\d{2})\s+TOTAL MOVIMIENTOS ABONOS\s+(\d+)', text, re.IGNORECASE)
-        if match_c:
-            imp_c = _clean_amount(match_c.group(1))
-            mov_c = int(match_c.group(2))
-        if match_a:
-            imp_a = _clean_amount(match_a.group(1))
-            mov_a = int(match_a.group(2))
+        totals = _first_groups(_TOTALS_DEB_RE, text)
+        if 'imp_c' in totals:
+            imp_c = _clean_amount(totals['imp_c'])
+            mov_c = int(totals['mov_c'])
+        if 'imp_a' in totals:
+            imp_a = _clean_amount(totals['imp_a'])
+            mov_a = int(totals['mov_a'])
             
     return imp_c, mov_c, imp_a, mov_a
 
+def _is_date_prefix(text: str) -> bool:
+    """True si el texto empieza con una fecha dd/MMM (p. ej. 02/ENE)."""
+    return len(text) >= 6 and text[:2].isdecimal() and text[2] == '/' and text[3:6].isalpha()
+
 def is_ignore_line(text: str) -> bool:
     """True si es encabezado/pie de página en BBVA"""
-    return any(re.search(pat, text, re.IGNORECASE) for pat in IGNORE_PATTERNS)
+    return _IGNORE_RE.search(text) is not None
 
+@lru_cache(maxsize=2048)
 def _format_flexible_date(date_str: str) -> Optional[str]:
     """Convierte varios formatos de fecha de BBVA a YYYY-MM-DD."""
     if not date_str: return None
     
     date_str = date_str.upper().replace('/', '-')
-    
-    for es, en in MONTH_MAP.items():
-        date_str = date_str.replace(es, en)
-        
-    for fmt in ("%d-%m-%Y", "%d-%m-%y"):
-        try:
-            return datetime.strptime(date_str, fmt).strftime("%Y-%m-%d")
-        except ValueError:
-            continue
-    return None
-
-# ... (Todas las funciones auxiliares _clean_amount, find_column_boundaries, group_words_into_lines son idénticas a las versiones anteriores) ...
+    date_str = _MONTH_RE.sub(lambda m: MONTH_MAP[m.group(0)], date_str)
+
+    # Equivale a probar "%d-%m-%Y" y "%d-%m-%y" con strptime, sin pasar por su parser
+    parts = date_str.split('-')
+    if len(parts) != 3 or not all(part.isdecimal() for part in parts):
+        return None
+    day, month, year = parts
+    if len(day) > 2 or len(month) > 2 or len(year) not in (2, 4):
+        return None
+    full_year = int(year)
+    if len(year) == 2:
+        full_year += 2000 if full_year < 69 else 1900
+    try:
+        return date(full_year, int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+# Las fechas de autorización/aplicación se repiten entre movimientos del mismo día
+@lru_cache(maxsize=512)
+def _to_iso_ddmmyy(date_str: str) -> str:
+    """Convierte dd/mm/yy a YYYY-MM-DD; si no es una fecha válida la regresa sin cambios."""
+    try:
+        return datetime.strptime(date_str, "%d/%m/%y").strftime("%Y-%m-%d")
+    except ValueError:
+        return date_str
+
+# Los mismos importes (comisiones, saldos en cero) se repiten a lo largo del estado de cuenta
+@lru_cache(maxsize=4096)
 def _clean_amount(text: Optional[str]) -> float:
-    if text is None or not isinstance(text, str) or text.strip() == '': return 0.0
-    try: return float(text.replace(',', '').strip())
+    if not text: return 0.0
+    # float() ya ignora espacios al inicio/fin y falla con cadenas vacías
+    try: return float(text.translate(_AMOUNT_DROP_TBL))
     except ValueError: return 0.0
 
 def _parse_clabe(text: str) -> Optional[str]:
     """Extrae la CLABE interbancaria de 18 dígitos."""
-    match = re.search(r'(?:No\.?\s+(?:de\s+)?)?Cuenta\s+CLABE\s+([\d\s]+)', text, re.IGNORECASE)
+    match = _CLABE_RE.search(text)
     if match:
-        cleaned_clabe = re.sub(r'\D', '', match.group(1))
+        cleaned_clabe = _NON_DIGIT_RE.sub('', match.group(1))
         if len(cleaned_clabe) == 18:
             return cleaned_clabe
     return None
@@ -115,12 +188,12 @@ def _parse_clabe(text: str) -> Optional[str]:
 def _parse_account_number(text: str) -> Optional[str]:
     """Extrae el número de cuenta o de tarjeta."""
     # Prioridad para tarjeta de crédito
-    match = re.search(r'No\.\s+de\s+Tarjeta\s+([\d\s]+)', text, re.IGNORECASE)
+    match = _ACCT_TC_RE.search(text)
     if match:
-        return re.sub(r'\s+', '', match.group(1))
+        return _WHITESPACE_RE.sub('', match.group(1))
     
     # Fallback para cuenta de débito
-    match = re.search(r'No\.?\s+(?:de\s+)?Cuenta\s+(\d+)', text, re.IGNORECASE)
+    match = _ACCT_DEB_RE.search(text)
     if match:
         return match.group(1)
     return None
@@ -128,44 +201,34 @@ def _parse_account_number(text: str) -> Optional[str]:
 def _parse_client_name(text: str) -> Optional[str]:
     """Extrae el nombre del titular usando varios métodos de fallback."""
     # Método 1: Búsqueda por "Nombre del Receptor"
-    match = re.search(r'Nombre\s+del\s+Receptor\s*:\s*(.+)', text, re.IGNORECASE)
+    match = _NAME_RCPT_RE.search(text)
     if match:
         name = match.group(1).strip()
         if 'código postal' not in name.lower():
             return name
 
     # Método 2: Búsqueda por línea debajo de "BBVA"
-    match = re.search(r'BBVA\s*\n\s*([A-ZÁÉÍÓÚÑ\s]{10,}\b(?:SA\s+DE\s+CV|S\s+DE\s+RL\s+DE\s+CV|SA\s+PI\s+DE\s+CV)?)', text)
+    match = _NAME_BBVA_RE.search(text)
     if match:
         name = match.group(1).strip()
         if 'estado de cuenta' not in name.lower():
             return name
             
     # Método 3: Búsqueda relativa al RFC (último recurso)
-    lines = text.splitlines()
-    rfc_line_index = -1
-    for i, line in enumerate(lines):
-        if re.search(r'^R\.F\.C\s+[A-Z0-9]+', line.strip(), re.IGNORECASE):
-            rfc_line_index = i
-            break
-    
-    if rfc_line_index != -1:
-        for i in range(rfc_line_index - 1, -1, -1):
-            line = lines[i].strip()
-            if len(line) > 10 and not re.search(r'^(No\.|Fecha|Periodo)', line, re.IGNORECASE):
+    # Un solo search multilínea ubica la línea del RFC; solo se parten las líneas anteriores
+    match = _RFC_LINE_RE.search(text)
+    if match:
+        for line in reversed(text[:match.start()].splitlines()):
+            line = line.strip()
+            if len(line) > 10 and not _NAME_SKIP_RE.search(line):
                 return line
     
     return None
 
 def _parse_period(text: str, is_credit: bool) -> Tuple[Optional[str], Optional[str]]:
     """Extrae las fechas de inicio y fin del periodo."""
-    regex = ''
-    if is_credit:
-        regex = r'Periodo\s.*?Del\s+([\d\/]{8,10})\s+al\s+([\d\/]{8,10})'
-    else:
-        regex = r'Periodo\s+(?:DEL\s+)?([\d]{2}\/(?:\w{3}|\d{2})\/\d{2,4})\s+AL\s+([\d]{2}\/(?:\w{3}|\d{2})\/\d{2,4})'
-    
-    match = re.search(regex, text, re.IGNORECASE | re.DOTALL)
+    regex = _PERIOD_CREDIT_RE if is_credit else _PERIOD_DEBITO_RE
+    match = regex.search(text)
     if match:
         start_date_str = match.group(1)
         end_date_str = match.group(2)
@@ -175,68 +238,78 @@ def _parse_period(text: str, is_credit: bool) -> Tuple[Optional[str], Optional[s
 
 def _parse_balances(text: str, is_credit: bool) -> Tuple[float, float]:
     """Extrae los saldos inicial y final."""
-    initial_balance, final_balance = 0.0, 0.0
-    if is_credit:
-        match_ini = re.search(r'Saldo Inicial del Periodo\s*\+?\s*\$?\s*([\d,]+\.\d{2})', text, re.IGNORECASE | re.DOTALL)
-        match_fin = re.search(r'Saldo al Corte\s*\$?\s*([\d,]+\.\d{2})', text, re.IGNORECASE | re.DOTALL)
-        if match_ini: initial_balance = _clean_amount(match_ini.group(1))
-        if match_fin: final_balance = _clean_amount(match_fin.group(1))
-    else:
-        match_ini = re.search(r'(?:Saldo\s+(?:de\s+)?Liquidación\s+Inicial|Saldo\s+Inicial)\s*\+?\s*\$?([\d,]+\.\d{2})', text, re.IGNORECASE)
-        match_fin = re.search(r'(?:Saldo\s+(?:de\s+Operación\s+)?Final)\s*(?:\(\+\))?\s*\$?([\d,]+\.\d{2})', text, re.IGNORECASE)
-        if match_ini: initial_balance = _clean_amount(match_ini.group(1))
-        if match_fin: final_balance = _clean_amount(match_fin.group(1))
-    return initial_balance, final_balance
+    balances = _first_groups(_BALANCES_TC_RE if is_credit else _BALANCES_DEB_RE, text)
+    return _clean_amount(balances.get('ini')), _clean_amount(balances.get('fin'))
 
 def _parse_rfc(text: str) -> Optional[str]:
     """
     Extrae el RFC del titular (12 o 13 caracteres), tolerando variaciones
     como "RFC", "R.F.C" y la presencia de un ":" después.
     """
-    match = re.search(r'R\.?F\.?C\.?\s*[:]?\s*([A-Z0-9]{12,13})', text, re.IGNORECASE)
+    match = _RFC_RE.search(text)
     if match:
         return match.group(1)
     return None
 
-def find_column_boundaries(page: pdfplumber.page.Page) -> Optional[Dict[str, Tuple[float, float]]]:
-    # ... (código idéntico)
-    header_keywords = ["CARGOS", "ABONOS", "SALDO"]
-    words = page.extract_words(x_tolerance=2, y_tolerance=2, keep_blank_chars=False)
-    boundaries = {}
+def find_column_boundaries(words: List[Dict]) -> Optional[Dict[str, Tuple[float, float]]]:
+    """Ubica las columnas CARGOS/ABONOS/SALDO a partir de las palabras ya extraídas de la página."""
+    boundaries, last_saldo = {}, None
     for word in words:
         text = word['text'].upper()
         if text == "CARGOS": boundaries['retiro'] = (word['x0'], word['x1'])
         elif text == "ABONOS": boundaries['deposito'] = (word['x0'], word['x1'])
-        elif text == "SALDO" and 'saldo' not in boundaries:
-            saldo_words = [w for w in words if w['text'].upper() == 'SALDO']
-            if saldo_words:
-                last_saldo = saldo_words[-1]
-                boundaries['saldo'] = (last_saldo['x0'], last_saldo['x1'])
+        # La columna de saldo es la del último "SALDO" de la página
+        elif text == "SALDO": last_saldo = word
+    if last_saldo:
+        boundaries['saldo'] = (last_saldo['x0'], last_saldo['x1'])
     return boundaries if len(boundaries) >= 3 else None
 
 def group_words_into_lines(words: List[Dict], tolerance: int = 3) -> List[List[Dict]]:
-    # ... (código idéntico)
+    """Agrupa en líneas las palabras cuya posición vertical cae dentro de la tolerancia."""
     if not words: return []
     lines, current_line = [], [words[0]]
     for word in words[1:]:
         if abs(word['top'] - current_line[-1]['top']) <= tolerance: current_line.append(word)
         else:
-            lines.append(sorted(current_line, key=lambda w: w['x0']))
+            current_line.sort(key=_X0)
+            lines.append(current_line)
             current_line = [word]
-    lines.append(sorted(current_line, key=lambda w: w['x0']))
+    current_line.sort(key=_X0)
+    lines.append(current_line)
     return lines
 
-def parse_debito(pdf: pdfplumber.PDF, year: str) -> List[Dict[str, any]]:
+def parse_debito(pdf: pdfplumber.PDF, year: str, page_texts: List[str]) -> List[Dict[str, any]]:
     all_transactions = []
+    # Partes de la descripción de cada transacción; se unen una sola vez al final
+    descriptions = []
     column_boundaries, in_transaction_section = None, False
     
-    for page_num, page in enumerate(pdf.pages, 1):
+    for page_num, (page, page_text) in enumerate(zip(pdf.pages, page_texts), 1):
+        # Con las columnas ya ubicadas, una página fuera de la sección de movimientos
+        # que no la abre no aporta nada: se omite antes de extraer sus palabras
+        if column_boundaries and not in_transaction_section and "Detalle de Movimientos Realizados" not in page_text:
+            continue
+
+        # Una sola extracción de palabras por página, compartida con la detección de columnas
+        words = page.extract_words(x_tolerance=2, y_tolerance=2)
         if not column_boundaries:
-            column_boundaries = find_column_boundaries(page)
+            column_boundaries = find_column_boundaries(words)
+            if column_boundaries:
+                logger.debug("Columnas BBVA ubicadas en la página %d: %s", page_num, column_boundaries)
         if not column_boundaries:
             continue
 
-        words = page.extract_words(x_tolerance=2, y_tolerance=2)
+        # Rangos de cada columna con su holgura, desempacados una vez por página
+        retiro_lo, retiro_hi = column_boundaries['retiro'][0], column_boundaries['retiro'][1] + 20
+        deposito_lo, deposito_hi = column_boundaries['deposito'][0], column_boundaries['deposito'][1] + 20
+        saldo_lo, saldo_hi = column_boundaries['saldo'][0], column_boundaries['saldo'][1] + 40
+
+        # Centro horizontal de cada palabra, calculado una sola vez por página
+        for w in words:
+            w['cx'] = (w['x0'] + w['x1']) / 2
+        # Palabras de la columna SALDO, para buscar el saldo de líneas que no lo traen
+        saldo_words = [w for w in words if saldo_lo <= w['cx'] <= saldo_hi]
+
         lines = group_words_into_lines(words)
 
         for line_words in lines:
@@ -254,35 +327,37 @@ def parse_debito(pdf: pdfplumber.PDF, year: str) -> List[Dict[str, any]]:
             if not in_transaction_section:
                 continue
 
-            date_match = re.match(r'(\d{2}/\w{3})', line_text)
-            if date_match:
+            if _is_date_prefix(line_text):
                 try:
-                    day, month_str = date_match.group(1).split('/')
+                    day, month_str = line_text[:2], line_text[3:6]
                     date_str = f"{year}-{MONTH_MAP.get(month_str.upper(), '00')}-{day}"
 
                     retiro, deposito, saldo = 0.0, 0.0, 0.0
                     description_parts = []
 
                     for word in line_words:
-                        word_center_x = (word['x0'] + word['x1']) / 2
-                        if column_boundaries['retiro'][0] <= word_center_x <= column_boundaries['retiro'][1] + 20:
+                        word_center_x = word['cx']
+                        if retiro_lo <= word_center_x <= retiro_hi:
                             retiro = _clean_amount(word['text'])
-                        elif column_boundaries['deposito'][0] <= word_center_x <= column_boundaries['deposito'][1] + 20:
+                        elif deposito_lo <= word_center_x <= deposito_hi:
                             deposito = _clean_amount(word['text'])
-                        elif column_boundaries['saldo'][0] <= word_center_x <= column_boundaries['saldo'][1] + 40:
+                        elif saldo_lo <= word_center_x <= saldo_hi:
                             saldo = _clean_amount(word['text'])
                         else:
                             description_parts.append(word['text'])
 
-                    # ✅ si el saldo no se encontró en la misma línea, buscar en todas las palabras de la página
+                    # ✅ si el saldo no se encontró en la misma línea, buscar en la columna SALDO de la página
                     if saldo == 0.0:
-                        for w in words:
-                            word_center_x = (w['x0'] + w['x1']) / 2
-                            if column_boundaries['saldo'][0] <= word_center_x <= column_boundaries['saldo'][1] + 40 and abs(w['top'] - line_words[0]['top']) < 5:
+                        for w in saldo_words:
+                            if abs(w['top'] - line_words[0]['top']) < 5:
                                 saldo = _clean_amount(w['text'])
                                 break
 
-                    clean_desc = re.sub(r'^\d{2}/\w{3}\s+\d{2}/\w{3}\s+', '', " ".join(description_parts)).strip()
+                    # Quita el prefijo "dd/MMM dd/MMM " (fechas de operación y liquidación)
+                    clean_desc = " ".join(description_parts)
+                    if clean_desc[6:7] == " " and clean_desc[13:14] == " " and _is_date_prefix(clean_desc) and _is_date_prefix(clean_desc[7:]):
+                        clean_desc = clean_desc[14:]
+                    clean_desc = clean_desc.strip()
                     
                     all_transactions.append({
                         "Fecha": date_str,
@@ -292,21 +367,24 @@ def parse_debito(pdf: pdfplumber.PDF, year: str) -> List[Dict[str, any]]:
                         "Saldo": saldo,
                         "Banco": "BBVA"
                     })
+                    descriptions.append([clean_desc])
 
                 except Exception as e:
-                    print(f"ADVERTENCIA (BBVA): No se pudo procesar la línea: '{line_text}'. Error: {e}")
+                    logger.warning("ADVERTENCIA (BBVA): No se pudo procesar la línea: '%s'. Error: %s", line_text, e)
             
             elif all_transactions and line_text.strip():
-                all_transactions[-1]["Descripción"] += " " + line_text.strip()
+                descriptions[-1].append(line_text.strip())
+
+    for transaction, parts in zip(all_transactions, descriptions):
+        transaction["Descripción"] = " ".join(parts)
 
     return all_transactions
 
-def parse_credit_card(pdf: pdfplumber.PDF, year: str) -> List[Dict[str, any]]:
+def parse_credit_card(page_texts: List[str], year: str) -> List[Dict[str, any]]:
     all_transactions = []
     in_transaction_section = False
     
-    for page_num, page in enumerate(pdf.pages, 1):
-        text = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+    for page_num, text in enumerate(page_texts, 1):
         lines = text.split("\n")
 
         for line in lines:
@@ -320,33 +398,23 @@ def parse_credit_card(pdf: pdfplumber.PDF, year: str) -> List[Dict[str, any]]:
                 continue
 
             # detectar línea con fechas tipo dd/mm/yy
-            match = re.match(r'(\d{2}/\d{2}/\d{2})\s+(\d{2}/\d{2}/\d{2})\s+(.*)', line)
+            match = _DATE_CREDIT_RE.match(line)
             if match:
                 fecha_aut, fecha_apli, rest = match.groups()
 
                 # normalizar a yyyy-mm-dd
-                def to_iso(date_str: str) -> str:
-                    try:
-                        # convierte dd/mm/yy → yyyy-mm-dd
-                        return datetime.strptime(date_str, "%d/%m/%y").strftime("%Y-%m-%d")
-                    except:
-                        return date_str  # fallback
-
-                fecha_aut_iso = to_iso(fecha_aut)
-                fecha_apli_iso = to_iso(fecha_apli)
+                fecha_aut_iso = _to_iso_ddmmyy(fecha_aut)
+                fecha_apli_iso = _to_iso_ddmmyy(fecha_apli)
 
                 # separar importe final
-                importe_match = re.search(r'(\$ ?-?\d{1,3}(?:,\d{3})*(?:\.\d{2})?)$', rest)
+                importe_match = _AMOUNT_CREDIT_RE.search(rest)
                 importe = 0.0
                 descripcion = rest
                 retiro, deposito = 0.0, 0.0
 
                 if importe_match:
-                    importe_txt = importe_match.group(1).replace("$", "").strip()
-                    try:
-                        importe = float(importe_txt.replace(",", ""))
-                    except:
-                        importe = 0.0
+                    # El regex ya garantiza un importe numérico: no hace falta probar float() con try/except
+                    importe = _clean_amount(importe_match.group(1))
                     descripcion = rest[:rest.rfind(importe_match.group(1))].strip()
 
                 if importe > 0:
@@ -369,22 +437,37 @@ def parse(pdf: pdfplumber.PDF, year: str) -> List[Dict[str, any]]:
     """
     Parsea un estado de cuenta de BBVA (débito o crédito) y extrae metadatos y transacciones.
     """
-    full_text = "\n".join(page.extract_text(x_tolerance=2) or "" for page in pdf.pages)
+    # 1. Extraer el texto una sola vez por página; se reutiliza para metadatos y para débito
+    page_texts = [page.extract_text(x_tolerance=2) or "" for page in pdf.pages]
+    full_text = "\n".join(page_texts)
     is_credit = "Saldo al Corte" in full_text and "No. de Tarjeta" in full_text
-    clabe = _parse_clabe(full_text)
+
+    # CLABE, RFC, periodo y saldos están en el encabezado de la primera página: se buscan
+    # ahí y solo si faltan se recorre todo el texto (la primera aparición es la misma).
+    # Cuenta y nombre se buscan en todo el texto porque sus métodos tienen prioridad entre sí.
+    header_text = page_texts[0] if page_texts else ""
+    clabe = _parse_clabe(header_text) or _parse_clabe(full_text)
     client_name = _parse_client_name(full_text)
     account_number = _parse_account_number(full_text)
-    periodo_inicial, periodo_final = _parse_period(full_text, is_credit)
-    saldo_inicial, saldo_final = _parse_balances(full_text, is_credit)
-    rfc = _parse_rfc(full_text)
+    periodo_inicial, periodo_final = _parse_period(header_text, is_credit)
+    if not periodo_inicial:
+        periodo_inicial, periodo_final = _parse_period(full_text, is_credit)
+    saldo_inicial, saldo_final = _parse_balances(header_text, is_credit)
+    if not (saldo_inicial and saldo_final):
+        full_inicial, full_final = _parse_balances(full_text, is_credit)
+        saldo_inicial = saldo_inicial or full_inicial
+        saldo_final = saldo_final or full_final
+    rfc = _parse_rfc(header_text) or _parse_rfc(full_text)
 
     imp_c, mov_c, imp_a, mov_a = _parse_totals(full_text, is_credit)
 
     # 2. Parsear transacciones
     if is_credit:
-        transactions = parse_credit_card(pdf, year)
+        # Las líneas de TC se separan con y_tolerance=2, distinta a la del texto de metadatos
+        credit_texts = [page.extract_text(x_tolerance=2, y_tolerance=2) or "" for page in pdf.pages]
+        transactions = parse_credit_card(credit_texts, year)
     else:
-        transactions = parse_debito(pdf, year)
+        transactions = parse_debito(pdf, year, page_texts)
 
     # 3. Post-procesamiento para totales de TC (se calculan, no se leen)
     if is_credit: